@@ -3,7 +3,7 @@
 """This python module aims to manage
 `DokuWiki <https://www.dokuwiki.org/dokuwiki>`_ wikis by using the
 provided `XML-RPC API <https://www.dokuwiki.org/devel:xmlrpc>`_.  It is
-compatible with python3+.
+compatible with python 3.8+.
 
 Installation
 ------------
@@ -15,35 +15,78 @@ the ``pip`` command to install it::
 Otherwise sources are in `github <https://github.com/fmenabe/python-dokuwiki>`_
 """
 
+import asyncio
 import base64
+import binascii
+import copy
+import functools
+import itertools
+import json
+import mmap
+import os
 import re
-import weakref
-from datetime import datetime, timedelta
-from urllib.parse import quote
+import threading
+import uuid
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.client import CannotSendRequest
+from urllib.parse import quote, urlsplit
+from xml.parsers import expat
 from xml.parsers.expat import ExpatError
-from xmlrpc.client import ServerProxy, Binary, Fault, Transport, SafeTransport, ProtocolError
+from xmlrpc.client import (ServerProxy, Binary, Fault, Transport,
+                           SafeTransport, ProtocolError, Unmarshaller,
+                           GzipDecodedResponse, dumps)
 
+# Error raised when the first line of the XML response is blank (kept for
+# backward compatibility, errors are now compared on their attributes).
 ERR = 'XML or text declaration not at start of entity: line 2, column 0'
+_ERR_CODE = expat.errors.codes[expat.errors.XML_ERROR_MISPLACED_XML_PI]
 
 _URL_RE = re.compile(r'(?P<proto>https?)://(?P<host>[^/]*)(?P<uri>/.*)?')
+# Dataentries regexes follow the syntax of the data plugin (any number of
+# dashes, '#' starting comments) and tolerate CRLF line endings.
+_DATAENTRY_RE = re.compile(
+    r'^[ \t]*----+[ \t]*dataentry\b[^\n]*\n?(.*?)(?:^(?P<end>----+)[ \t]*\r?$|\Z)',
+    re.MULTILINE | re.DOTALL)
+_DATAENTRY_LINE_RE = re.compile(
+    r'^[ \t]*([^:\n#]+?)[ \t]*:[ \t]*([^#\n]*?)[ \t\r]*(?:#[^\n]*)?$', re.MULTILINE)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(date):
+    """Convert *date* string (or timestamp) to a `datetime` object. Results are
+    cached as responses listing changes or versions often repeat the same dates.
+    """
+    if isinstance(date, int):
+        # JSON-RPC API returns Unix timestamps.
+        return datetime.fromtimestamp(date, timezone.utc).replace(tzinfo=None)
+    # ISO 8601 dates are parsed by the (C implemented) datetime.fromisoformat
+    # and other dates (%Y%m%dT%H:%M:%S) have fixed width fields.
+    return (datetime.fromisoformat(date[:-5])
+            if len(date) == 24
+            else datetime(int(date[0:4]), int(date[4:6]), int(date[6:8]),
+                          int(date[9:11]), int(date[12:14]), int(date[15:17])))
 
 def date(date):
     """DokuWiki returns dates of `xmlrpc.client` ``DateTime``
     type and the format changes between DokuWiki versions ... This function
     convert *date* to a `datetime` object.
     """
-    date = date.value
-    return (datetime.strptime(date[:-5], '%Y-%m-%dT%H:%M:%S')
-            if len(date) == 24
-            else datetime.strptime(date, '%Y%m%dT%H:%M:%S'))
+    return _parse_date(getattr(date, 'value', date))
 
 def utc2local(date):
     """DokuWiki returns date with a +0000 timezone. This function convert *date*
     to the local time.
     """
-    date_offset = (datetime.now() - datetime.utcnow()).total_seconds()
-    date_offset = int(round(date_offset / 60 / 60))
-    return date + timedelta(hours=date_offset)
+    # The offset is the one of the local timezone at *date* (so daylight
+    # saving time is handled).
+    return date.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+def _blank_line_error(err):
+    """Returns whether the `ExpatError` *err* is due to a blank first line in
+    the XML response, which happens although the call succeeded."""
+    return err.code == _ERR_CODE and err.lineno == 2 and err.offset == 0
 
 
 class DokuWikiError(Exception):
@@ -51,33 +94,277 @@ class DokuWikiError(Exception):
     pass
 
 
-def CookiesTransport(proto='https'):
+class _JsonRpcParser:
+    """Parser and unmarshaller collecting a JSON-RPC response."""
+    def __init__(self):
+        self._data = []
+        self._result = None
+
+    def feed(self, data):
+        self._data.append(data)
+
+    def close(self):
+        if self._data is not None:
+            self._result = json.loads(b''.join(self._data))
+            self._data = None
+        return self._result
+
+
+class _JsonRpcMixin:
+    """Mixin that makes an `xmlrpc.client` transport exchange JSON payloads."""
+    def send_headers(self, connection, headers):
+        headers = [(key, 'application/json' if key == 'Content-Type' else value)
+                   for key, value in headers]
+        super().send_headers(connection, headers)
+
+    def getparser(self):
+        parser = _JsonRpcParser()
+        return parser, parser
+
+
+class _XmlRpcParser:
+    """Expat based parser feeding an `xmlrpc.client.Unmarshaller`. Unlike the
+    default parser, the text of an element is buffered and passed in one call
+    instead of one per line, entity or input block, which is much faster for
+    big texts like pages content.
+    """
+    def __init__(self, target):
+        self._parser = expat.ParserCreate(None, None)
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = target.start
+        self._parser.EndElementHandler = target.end
+        self._parser.CharacterDataHandler = target.data
+        target.xml(None, None)
+
+    def feed(self, data):
+        self._parser.Parse(data, False)
+
+    def close(self):
+        self._parser.Parse(b'', True)
+
+
+class _Unmarshaller(Unmarshaller):
+    """Unmarshaller that can decode base64 values directly into the file
+    *output* as they are parsed, instead of keeping them in memory. The
+    values are then replaced by empty `xmlrpc.client.Binary` objects.
+    """
+    def __init__(self, output=None, **kwargs):
+        super().__init__(**kwargs)
+        self._output = output
+        self._base64 = None
+
+    def start(self, tag, attrs):
+        if self._output is not None and tag == 'base64':
+            self._base64 = ''
+        super().start(tag, attrs)
+
+    def data(self, text):
+        if self._base64 is None:
+            return super().data(text)
+        # Decode by blocks of 4 characters, the remaining ones being kept for
+        # the next call.
+        text = self._base64 + ''.join(text.split())
+        size = len(text) - len(text) % 4
+        self._output.write(binascii.a2b_base64(text[:size]))
+        self._base64 = text[size:]
+
+    def end(self, tag):
+        if self._base64 is None or tag != 'base64':
+            return super().end(tag)
+        if self._base64:
+            self._output.write(binascii.a2b_base64(self._base64))
+        self._base64 = None
+        self.append(Binary())
+        self._value = 0
+
+
+class _Base64Body:
+    """XML-RPC request body where the content of the binary file *fhandler* is
+    base64 encoded on the fly, between the *prefix* and *suffix* parts of the
+    request, for not loading it in memory. It can be sent (and so iterated)
+    several times.
+    """
+    # Multiple of 3 for not having padding between blocks.
+    block_size = 3 * 2 ** 16
+
+    def __init__(self, prefix, fhandler, suffix):
+        self._prefix = prefix
+        self._fhandler = fhandler
+        self._suffix = suffix
+        size = os.fstat(fhandler.fileno()).st_size
+        self._length = len(prefix) + (size + 2) // 3 * 4 + len(suffix)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        yield self._prefix
+        self._fhandler.seek(0)
+        for block in iter(lambda: self._fhandler.read(self.block_size), b''):
+            yield binascii.b2a_base64(block, newline=False)
+        yield self._suffix
+
+
+class _TransportMixin:
+    """Mixin improving `xmlrpc.client` transports:
+
+        * the server is asked to keep the connection open. The connection is
+          cached by the transport and reused by all the calls of a `DokuWiki`
+          object, avoiding a TCP (and TLS) handshake per call. If the cached
+          connection is unusable, it is reopened.
+        * XML responses are parsed by `_XmlRpcParser` and read by blocks of
+          *read_size* bytes (instead of 1 KiB).
+        * base64 values of responses are written to the *output* file when
+          it is set (see `_Unmarshaller`).
+    """
+    read_size = 65536
+    output = None
+
+    def request(self, host, handler, request_body, verbose=False):
+        # The cached connection may have been left in a bad state, so the
+        # request is retried once on a new connection. Only errors raised
+        # before the request is sent are retried, for not executing it twice
+        # (disconnections are already retried by the default transport).
+        try:
+            return super().request(host, handler, request_body, verbose)
+        except CannotSendRequest:
+            self.close()
+            return super().request(host, handler, request_body, verbose)
+
+    def send_headers(self, connection, headers):
+        super().send_headers(connection, headers + [('Connection', 'keep-alive')])
+
+    def getparser(self):
+        unmarshaller = _Unmarshaller(output=self.output,
+                                     use_datetime=self._use_datetime,
+                                     use_builtin_types=self._use_builtin_types)
+        return _XmlRpcParser(unmarshaller), unmarshaller
+
+    def parse_response(self, response):
+        if response.getheader('Content-Encoding', '') == 'gzip':
+            stream = GzipDecodedResponse(response)
+        else:
+            stream = response
+
+        parser, unmarshaller = self.getparser()
+        while True:
+            data = stream.read(self.read_size)
+            if not data:
+                break
+            if self.verbose:
+                print('body:', repr(data))
+            parser.feed(data)
+
+        if stream is not response:
+            stream.close()
+        parser.close()
+        return unmarshaller.close()
+
+
+class KeepAliveTransport(_TransportMixin, Transport):
+    """Persistent transport over HTTP."""
+
+
+class SafeKeepAliveTransport(_TransportMixin, SafeTransport):
+    """Persistent transport over HTTPS."""
+
+
+class JsonRpcTransport(_JsonRpcMixin, KeepAliveTransport):
+    """Transport for the JSON-RPC API over HTTP."""
+
+
+class SafeJsonRpcTransport(_JsonRpcMixin, SafeKeepAliveTransport):
+    """Transport for the JSON-RPC API over HTTPS."""
+
+
+def _transport_class(proto, jsonrpc=False):
+    """Returns the transport class matching *proto* and the RPC protocol."""
+    if jsonrpc:
+        return JsonRpcTransport if proto == 'http' else SafeJsonRpcTransport
+    return KeepAliveTransport if proto == 'http' else SafeKeepAliveTransport
+
+
+def _json_default(obj):
+    """Serialize `xmlrpc.client` types to JSON."""
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.data).decode('ascii')
+    raise TypeError('cannot serialize %s objects' % type(obj).__name__)
+
+
+class _JsonRpcMethod:
+    """Callable for a (possibly dotted) JSON-RPC method name."""
+    def __init__(self, send, name):
+        self.__send = send
+        self.__name = name
+
+    def __getattr__(self, name):
+        return _JsonRpcMethod(self.__send, '%s.%s' % (self.__name, name))
+
+    def __call__(self, *args):
+        return self.__send(self.__name, args)
+
+
+class _JsonRpcProxy:
+    """JSON-RPC counterpart of `xmlrpc.client.ServerProxy`. Methods are
+    accessed the same way (``proxy.wiki.getPage(page)``) and errors are
+    raised as `xmlrpc.client.Fault` so both proxies are interchangeable.
+    """
+    def __init__(self, uri, transport, verbose=False):
+        _, self.__host, self.__handler = urlsplit(uri)[:3]
+        self.__transport = transport
+        self.__verbose = verbose
+        self.__ids = itertools.count(1)
+
+    def __request(self, methodname, params):
+        request = json.dumps({'jsonrpc': '2.0',
+                              'id': next(self.__ids),
+                              'method': methodname,
+                              'params': params}, default=_json_default)
+        response = self.__transport.request(self.__host, self.__handler,
+                                            request.encode('utf-8'),
+                                            verbose=self.__verbose)
+        error = response.get('error')
+        if error:
+            raise Fault(error.get('code', 0), error.get('message', ''))
+        return response.get('result')
+
+    def __getattr__(self, name):
+        return _JsonRpcMethod(self.__request, name)
+
+    def __call__(self, attr):
+        if attr == 'close':
+            return self.__transport.close
+        elif attr == 'transport':
+            return self.__transport
+        raise AttributeError('Attribute %r not found' % (attr,))
+
+
+def CookiesTransport(proto='https', jsonrpc=False, **kwargs):
     """Generate transport class when using cookie based authentication."""
-    _TransportClass_ = Transport if proto == 'http' else SafeTransport
+    _TransportClass_ = _transport_class(proto, jsonrpc)
 
     class CookiesTransport(_TransportClass_):
         """A Python3 xmlrpc.client.Transport subclass that retains cookies."""
-        def __init__(self):
-            _TransportClass_.__init__(self)
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
             self._cookies = dict()
 
         def send_headers(self, connection, headers):
             if self._cookies:
                 cookies = map(lambda x: x[0] + '=' + x[1], self._cookies.items())
                 connection.putheader('Cookie', '; '.join(cookies))
-            _TransportClass_.send_headers(self, connection, headers)
+            super().send_headers(connection, headers)
 
         def parse_response(self, response):
             """parse and store cookie"""
-            try:
-                for header in response.msg.get_all("Set-Cookie"):
-                    cookie = header.split(";", 1)[0]
-                    cookieKey, cookieValue = cookie.split("=", 1)
+            for header in response.msg.get_all("Set-Cookie", ()):
+                cookie = header.partition(";")[0]
+                cookieKey, sep, cookieValue = cookie.partition("=")
+                if sep:
                     self._cookies[cookieKey] = cookieValue
-            finally:
-                return _TransportClass_.parse_response(self, response)
+            return super().parse_response(response)
 
-    return CookiesTransport()
+    return CookiesTransport(**kwargs)
 
 
 class DokuWiki:
@@ -108,28 +395,92 @@ class DokuWiki:
     .. code::
 
         wiki = dokuwiki.DokuWiki('URL', 'USER', 'PASSWORD', cookieAuth=True)
+
+    Recent DokuWiki versions also provide a
+    `JSON-RPC API <https://www.dokuwiki.org/devel:jsonrpc>`_ which is lighter
+    to serialize than XML-RPC, notably for big responses (``pages.list``,
+    ``pages.changes``, ...). The ``protocol`` parameter selects the API to
+    use: *xmlrpc* (default), *jsonrpc* or *auto* (use JSON-RPC if the wiki
+    provides it and fall back to XML-RPC otherwise):
+
+    .. code::
+
+        wiki = dokuwiki.DokuWiki('URL', 'USER', 'PASSWORD', protocol='auto')
     """
     def __init__(self, url, user, password, **kwargs):
-        """Initialize the object by connecting to the XMLRPC server."""
+        """Initialize the object by connecting to the RPC server."""
         # Parse input URL
         try:
             params = _URL_RE.search(url).groupdict()
         except AttributeError:
             raise DokuWikiError("invalid url '%s'" %  url)
 
-        # Set auth string or transport for cookie based authentication.
-        auth = '{:s}:{:s}@'.format(user, quote(password, safe=''))
-        cookie_auth = kwargs.pop('cookieAuth', False)
-        if cookie_auth:
+        protocol = kwargs.pop('protocol', 'xmlrpc')
+        if protocol not in ('xmlrpc', 'jsonrpc', 'auto'):
+            raise DokuWikiError("invalid protocol '%s'" % protocol)
+
+        # Set auth string (the transport is set for cookie based authentication).
+        auth = f"{user}:{quote(password, safe='')}@"
+        self._cookie_auth = kwargs.pop('cookieAuth', False)
+        if self._cookie_auth:
             auth = ''
-            kwargs['transport'] = CookiesTransport(params['proto'])
 
-        xmlrpc_url = '%s://%s%s%s/lib/exe/xmlrpc.php' % (
-            params['proto'], auth, params['host'], params['uri'] or '')
-        self.proxy = ServerProxy(xmlrpc_url, **kwargs)
+        self._proto = params['proto']
+        self._proxy_kwargs = kwargs
+        self._rpc_url = (f"{params['proto']}://{auth}{params['host']}"
+                         f"{params['uri'] or ''}/lib/exe/")
+        self._jsonrpc = protocol != 'xmlrpc'
+        self.proxy = self._make_proxy()
+        self._methods = {}
+        # Cache for the calls returning data that rarely changes (opt-in
+        # with the *cache* parameter of the methods).
+        self._cached_send = functools.lru_cache(maxsize=256)(self.send)
+
+        try:
+            self._connect(user, password)
+        except ProtocolError as err:
+            if protocol != 'auto' or err.errcode != 404:
+                raise
+            # JSON-RPC API is not available, fall back to XML-RPC.
+            self.close()
+            self._jsonrpc = False
+            self.proxy = self._make_proxy()
+            self._methods = {}
+            self._connect(user, password)
 
+        # Set "namespaces" for pages and medias functions.
+        self.pages = _Pages(self)
+        self.medias = _Medias(self)
+        self.structs = _Structs(self)
+
+    def _make_proxy(self):
+        """Returns a new proxy to the RPC server of the wiki."""
+        kwargs = dict(self._proxy_kwargs)
+        # Transport parameters are only used by `ServerProxy` when it creates
+        # the transport itself.
+        transport_kwargs = {key: kwargs[key]
+                            for key in ('use_datetime', 'use_builtin_types', 'headers')
+                            if key in kwargs}
+        if self._proto == 'https':
+            transport_kwargs['context'] = kwargs.get('context')
+
+        if self._cookie_auth:
+            kwargs['transport'] = CookiesTransport(self._proto, self._jsonrpc,
+                                                   **transport_kwargs)
+        elif kwargs.get('transport') is None:
+            kwargs['transport'] = _transport_class(self._proto, self._jsonrpc)(
+                **transport_kwargs)
+
+        if not self._jsonrpc:
+            return ServerProxy(self._rpc_url + 'xmlrpc.php', **kwargs)
+        return _JsonRpcProxy(self._rpc_url + 'jsonrpc.php', kwargs['transport'],
+                             kwargs.get('verbose', False))
+
+    def _connect(self, user, password):
+        """Log in (for cookie based authentication) and ensure the connection
+        is up."""
         # Force login for cookie based authentication.
-        if cookie_auth and not self.login(user, password):
+        if self._cookie_auth and not self.login(user, password):
             raise DokuWikiError('invalid login or password!')
 
         # Dummy call to ensure the connection is up.
@@ -140,39 +491,135 @@ class DokuWiki:
                 raise DokuWikiError('invalid login or password!')
             raise
 
-        # Set "namespaces" for pages and medias functions.
-        self.pages = _Pages(weakref.ref(self)())
-        self.medias = _Medias(weakref.ref(self)())
-        self.structs = _Structs(weakref.ref(self)())
-
     def send(self, command, *args, **kwargs):
-        """Generic method for executing an XML-RPC *command*. *args* and
+        """Generic method for executing an RPC *command*. *args* and
         *kwargs* are the arguments and parameters needed by the command.
         """
-        args = list(args)
         if kwargs:
-            args.append(kwargs)
+            args += (kwargs,)
 
-        method = self.proxy
-        for elt in command.split('.'):
-            method = getattr(method, elt)
+        # Resolving a command walks the proxy attributes, creating a method
+        # object for each part, so methods are cached by command.
+        method = self._methods.get(command)
+        if method is None:
+            method = self._methods[command] = functools.reduce(
+                getattr, command.split('.'), self.proxy)
 
         try:
             return method(*args)
         except Fault as err:
-            if err.faultCode == 121:
-                return {}
-            elif err.faultCode == 321:
-                return []
-            raise DokuWikiError(err)
+            return self._fault(err)
+        except ExpatError as err:
+            if not _blank_line_error(err):
+                raise DokuWikiError(err)
+
+    def _send_cached(self, command, *args):
+        """Execute *command* like `send` but the result is cached (until
+        ``_cached_send`` is cleared). A copy of the result is returned so
+        callers can't modify the cached value."""
+        return copy.deepcopy(self._cached_send(command, *args))
+
+    def _send_once(self, attr, command):
+        """Execute *command* the first time and keep its result in the *attr*
+        attribute. This is used instead of `functools.cached_property` which,
+        before Python 3.12, holds a lock shared by all the instances while
+        the value is computed."""
+        try:
+            return self.__dict__[attr]
+        except KeyError:
+            return self.__dict__.setdefault(attr, self.send(command))
+
+    @property
+    def _streaming(self):
+        """Whether medias can be streamed from/to files (only with XML-RPC
+        and the transports of this module)."""
+        return (not self._jsonrpc
+                and isinstance(self.proxy('transport'), _TransportMixin))
+
+    def _send_to_file(self, output, command, *args, **kwargs):
+        """Execute *command* like `send` but base64 values of the response
+        are written to the binary file *output* as they are received."""
+        transport = self.proxy('transport')
+        transport.output = output
+        try:
+            return self.send(command, *args, **kwargs)
+        finally:
+            transport.output = None
+
+    def _send_file(self, command, *args, **kwargs):
+        """Execute *command* like `send` but one of the arguments is an opened
+        binary file which is sent as base64 value, the file being encoded
+        while it is sent instead of being loaded in memory."""
+        if kwargs:
+            args += (kwargs,)
+        fhandler = next(arg for arg in args if hasattr(arg, 'read'))
+
+        # Generate the request with a placeholder for the file.
+        marker = uuid.uuid4().hex
+        encoding = self._proxy_kwargs.get('encoding') or 'utf-8'
+        request = dumps(tuple(marker if arg is fhandler else arg for arg in args),
+                        command, encoding=encoding,
+                        allow_none=self._proxy_kwargs.get('allow_none', False))
+        # The request is encoded like `xmlrpc.client.ServerProxy` does.
+        prefix, suffix = request.encode(encoding, 'xmlcharrefreplace').split(
+            f'<value><string>{marker}</string></value>'.encode(encoding), 1)
+        body = _Base64Body(prefix + b'<value><base64>', fhandler,
+                           b'</base64></value>' + suffix)
+
+        _, host, handler = urlsplit(self._rpc_url + 'xmlrpc.php')[:3]
+        try:
+            response = self.proxy('transport').request(
+                host, handler, body, verbose=self._proxy_kwargs.get('verbose', False))
+        except Fault as err:
+            return self._fault(err)
         except ExpatError as err:
-            if str(err) != ERR:
+            if not _blank_line_error(err):
                 raise DokuWikiError(err)
+            return None
+        return response[0] if len(response) == 1 else response
+
+    @staticmethod
+    def _fault(err):
+        """Returns an empty result for faults meaning that nothing was found
+        and raise `DokuWikiError` for the others."""
+        if err.faultCode == 121:
+            return {}
+        elif err.faultCode == 321:
+            return []
+        raise DokuWikiError(err)
+
+    def multicall(self, calls):
+        """Execute in a single request the XML-RPC commands of *calls*, a list
+        of ``(command, args)`` tuples, and returns the list of their results
+        (in the same order). This saves a network round-trip per command::
+
+            wiki.multicall([('wiki.getPage', ('page1',)),
+                            ('wiki.getPageInfo', ('page2',))])
+
+        Commands are sent one by one when using the JSON-RPC API.
+        """
+        if self._jsonrpc:
+            return [self.send(command, *args) for command, args in calls]
+
+        results = self.send('system.multicall',
+                            [{'methodName': command, 'params': list(args)}
+                             for command, args in calls])
+
+        # Results are wrapped in a single element list and faults are
+        # returned as structures.
+        values = []
+        for result in results:
+            if isinstance(result, dict):
+                fault = Fault(result.get('faultCode'), result.get('faultString'))
+                values.append(self._fault(fault))
+            else:
+                values.append(result[0])
+        return values
 
     @property
     def version(self):
         """Property that returns the DokuWiki version of the remote Wiki."""
-        return self.send('dokuwiki.getVersion')
+        return self._send_once('_version', 'dokuwiki.getVersion')
 
     @property
     def time(self):
@@ -187,21 +634,53 @@ class DokuWiki:
         Wiki. This is DokuWiki implementation specific and independent of the
         supported standard API version returned by ``wiki.getRPCVersionSupported``.
         """
-        return self.send('dokuwiki.getXMLRPCAPIVersion')
+        return self._send_once('_xmlrpc_version', 'dokuwiki.getXMLRPCAPIVersion')
 
     @property
     def xmlrpc_supported_version(self):
         """Property that returns *2* with the supported RPC API version."""
-        return self.send('wiki.getRPCVersionSupported')
+        return self._send_once('_xmlrpc_supported_version', 'wiki.getRPCVersionSupported')
 
     @property
     def title(self):
         """Property that returns the title of the wiki."""
-        return self.send('dokuwiki.getTitle')
+        return self._send_once('_title', 'dokuwiki.getTitle')
+
+    def close(self):
+        """Close the connection to the wiki. It is transparently reopened by
+        the next call."""
+        self.proxy('close')()
+
+    def pool(self, size=8):
+        """Returns a `ProxyPool` of *size* connections to the wiki for
+        executing calls concurrently (a connection only runs one call at a
+        time)::
+
+            with wiki.pool() as pool:
+                contents = pool.map('wiki.getPage', ['page1', 'page2'])
+        """
+        return ProxyPool(self, size)
+
+    def _clone(self):
+        """Returns a copy of this object using its own proxy, and so its own
+        connection (authentication cookies are copied)."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.proxy = self._make_proxy()
+        clone._methods = {}
+        clone._cached_send = functools.lru_cache(maxsize=256)(clone.send)
+        if self._cookie_auth:
+            clone.proxy('transport')._cookies.update(self.proxy('transport')._cookies)
+        clone.pages = _Pages(clone)
+        clone.medias = _Medias(clone)
+        clone.structs = _Structs(clone)
+        return clone
 
     def login(self, user, password):
         """Log to the wiki using *user* and *password* credentials. It returns
         a boolean that indicates if the user succesfully authenticate."""
+        # Cached results (like permissions) depend on the user.
+        self._cached_send.cache_clear()
         return self.send('dokuwiki.login', user, password)
 
     def add_acl(self, scope, user, permission):
@@ -210,6 +689,7 @@ class DokuWiki:
         with *permission* level. It returns a boolean that indicate if the rule
         was correctly added.
         """
+        self._cached_send.cache_clear()
         return self.send('plugin.acl.addAcl', scope, user, permission)
 
     def del_acl(self, scope, user):
@@ -217,6 +697,7 @@ class DokuWiki:
         *@group* syntax is used). It returns a boolean that indicate if the rule
         was correctly removed.
         """
+        self._cached_send.cache_clear()
         return self.send('plugin.acl.delAcl', scope, user)
 
 
@@ -264,13 +745,23 @@ class _Pages:
         """
         return self._dokuwiki.send('wiki.getPageVersions', page, offset)
 
-    def info(self, page, version=None):
+    def info(self, page, version=None, batched=False, cache=False):
         """Returns informations of *page*. Informations of the last version
-        is returned if *version* is not set.
+        is returned if *version* is not set. If *batched* is set, *page* is a
+        list of pages and the list of their informations is retrieved using
+        a single request. If *cache* is set, the result is cached until a
+        page is modified with this object.
         """
-        return (self._dokuwiki.send('wiki.getPageInfoVersion', page, version)
+        if batched:
+            return self._dokuwiki.multicall(
+                [('wiki.getPageInfoVersion', (name, version))
+                 if version is not None
+                 else ('wiki.getPageInfo', (name,))
+                 for name in page])
+        send = self._dokuwiki._send_cached if cache else self._dokuwiki.send
+        return (send('wiki.getPageInfoVersion', page, version)
                 if version is not None
-                else self._dokuwiki.send('wiki.getPageInfo', page))
+                else send('wiki.getPageInfo', page))
 
     def get(self, page, version=None):
         """Returns the content of *page*. The content of the last version is
@@ -281,6 +772,17 @@ class _Pages:
                 else self._dokuwiki.send('wiki.getPage', page))
 
 
+    def info_many(self, pages):
+        """Returns informations of the last version of each page of *pages*
+        using a single request."""
+        return self.info(pages, batched=True)
+
+    def get_many(self, pages):
+        """Returns the content of the last version of each page of *pages*
+        using a single request."""
+        return self._dokuwiki.multicall([('wiki.getPage', (page,))
+                                         for page in pages])
+
     def append(self, page, content, **options):
         """Appends *content* text to *page*.
 
@@ -289,6 +791,7 @@ class _Pages:
             * *sum*: (str) change summary
             * *minor*: (bool) whether this is a minor change
         """
+        self._dokuwiki._cached_send.cache_clear()
         return self._dokuwiki.send('dokuwiki.appendPage', page, content, options)
 
     def html(self, page, version=None):
@@ -299,6 +802,12 @@ class _Pages:
                 if version is not None
                 else self._dokuwiki.send('wiki.getPageHTML', page))
 
+    def html_many(self, pages):
+        """Returns HTML content of the last version of each page of *pages*
+        using a single request."""
+        return self._dokuwiki.multicall([('wiki.getPageHTML', (page,))
+                                         for page in pages])
+
     def set(self, page, content, **options):
         """Set/replace the *content* of *page*.
 
@@ -307,13 +816,14 @@ class _Pages:
             * *sum*: (str) change summary
             * *minor*: (bool) whether this is a minor change
         """
+        self._dokuwiki._cached_send.cache_clear()
         try:
             return self._dokuwiki.send('wiki.putPage', page, content, options)
         except ExpatError as err:
             # Sometime the first line of the XML response is blank which raise
             # the 'ExpatError' exception although the change has been done. This
             # allow to ignore the error.
-            if str(err) != ERR:
+            if not _blank_line_error(err):
                 raise DokuWikiError(err)
 
     def delete(self, page):
@@ -334,13 +844,27 @@ class _Pages:
         if result['unlockfail']:
             raise DokuWikiError('unable to unlock page')
 
-    def permission(self, page):
-        """Returns the permission level of *page*."""
-        return self._dokuwiki.send('wiki.aclCheck', page)
-
-    def links(self, page):
-        """Returns a list of all links contained in *page*."""
-        return self._dokuwiki.send('wiki.listLinks', page)
+    def permission(self, page, batched=False, cache=False):
+        """Returns the permission level of *page*. If *batched* is set, *page*
+        is a list of pages and the list of their permission levels is retrieved
+        using a single request. If *cache* is set, the result is cached until
+        a page or an ACL is modified with this object."""
+        if batched:
+            return self._dokuwiki.multicall([('wiki.aclCheck', (name,))
+                                             for name in page])
+        send = self._dokuwiki._send_cached if cache else self._dokuwiki.send
+        return send('wiki.aclCheck', page)
+
+    def links(self, page, batched=False, cache=False):
+        """Returns a list of all links contained in *page*. If *batched* is set,
+        *page* is a list of pages and the list of their links is retrieved
+        using a single request. If *cache* is set, the result is cached until
+        a page is modified with this object."""
+        if batched:
+            return self._dokuwiki.multicall([('wiki.listLinks', (name,))
+                                             for name in page])
+        send = self._dokuwiki._send_cached if cache else self._dokuwiki.send
+        return send('wiki.listLinks', page)
 
     def backlinks(self, page):
         """Returns a list of all links referencing *page*."""
@@ -386,21 +910,51 @@ class _Medias:
         to a file. By default, the filename is the name of the media but it can
         be changed with *filename* parameter. *overwrite* parameter allow to
         overwrite the file if it already exists locally.
+
+        .. deprecated:: 1.4.0
+            *b64decode* parameter. The data is already decoded from the base64
+            form used on the wire. For servers encoding medias twice, call
+            `binascii.a2b_base64` on the returned data.
         """
-        import os
+        if dirpath is not None:
+            if filename is None:
+                filename = media.replace('/', ':').split(':')[-1]
+            os.makedirs(dirpath, exist_ok=True)
+            filepath = os.path.join(dirpath, filename)
+            if os.path.exists(filepath) and not overwrite:
+                raise FileExistsError("[Errno 17] File exists: '%s'" % filepath)
+
+            if self._dokuwiki._streaming and not b64decode:
+                # Write the media to a temporary file while it is received and
+                # only replace *filepath* once the download succeeded. The file
+                # is created by open() (and not tempfile) so it has the same
+                # permissions than other files.
+                tmppath = os.path.join(dirpath, f'.{filename}.{uuid.uuid4().hex}.part')
+                try:
+                    with open(tmppath, 'xb') as fhandler:
+                        self._dokuwiki._send_to_file(fhandler, 'wiki.getAttachment', media)
+                    os.replace(tmppath, filepath)
+                except BaseException:
+                    if os.path.exists(tmppath):
+                        os.remove(tmppath)
+                    raise
+                return
+
         data = self._dokuwiki.send('wiki.getAttachment', media)
-        data = base64.b64decode(data) if b64decode else data.data
+        # JSON-RPC API returns base64 encoded data as string and XML-RPC
+        # returns bytes with *use_builtin_types*.
+        if isinstance(data, Binary):
+            data = data.data
+        elif isinstance(data, str):
+            data = binascii.a2b_base64(data)
+        if b64decode:
+            warnings.warn("'b64decode' parameter is deprecated, use "
+                          "binascii.a2b_base64() on the returned data instead",
+                          DeprecationWarning, stacklevel=2)
+            data = binascii.a2b_base64(data)
         if dirpath is None:
             return data
 
-        if filename is None:
-            filename = media.replace('/', ':').split(':')[-1]
-        if not os.path.exists(dirpath):
-            os.makedirs(dirpath)
-        filepath = os.path.join(dirpath, filename)
-        if os.path.exists(filepath) and not overwrite:
-            raise FileExistsError("[Errno 17] File exists: '%s'" % filepath)
-
         with open(filepath, 'wb') as fhandler:
             fhandler.write(data)
 
@@ -413,14 +967,40 @@ class _Medias:
         if the media must be overwrite if it exists remotely.
         """
         with open(filepath, 'rb') as fhandler:
-            self._dokuwiki.send('wiki.putAttachment', media,
-                                Binary(fhandler.read()), ow=overwrite)
+            if self._dokuwiki._streaming:
+                # Encode the file while it is sent.
+                self._dokuwiki._send_file('wiki.putAttachment', media, fhandler,
+                                          ow=overwrite)
+                return
+
+            try:
+                # Map the file instead of reading it so its content is paged
+                # by the kernel instead of being copied in memory.
+                mapped = mmap.mmap(fhandler.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped.
+                self._dokuwiki.send('wiki.putAttachment', media, Binary(), ow=overwrite)
+                return
+            with mapped:
+                data = Binary()
+                data.data = mapped
+                self._dokuwiki.send('wiki.putAttachment', media, data, ow=overwrite)
 
     def set(self, media, _bytes, overwrite=True, b64encode=False):
         """Set *media* from *_bytes*. *overwrite* parameter specify if the media
         must be overwrite if it exists remotely.
+
+        .. deprecated:: 1.4.0
+            *b64encode* parameter. `xmlrpc.client.Binary` already sends the
+            data in base64 form on the wire.
         """
-        data = base64.b64encode(_bytes) if b64encode else Binary(_bytes)
+        if b64encode:
+            warnings.warn("'b64encode' parameter is deprecated, the data is "
+                          "already base64 encoded on the wire",
+                          DeprecationWarning, stacklevel=2)
+            data = base64.b64encode(_bytes)
+        else:
+            data = Binary(_bytes)
         self._dokuwiki.send('wiki.putAttachment', media, data, ow=overwrite)
 
     def delete(self, media):
@@ -439,11 +1019,14 @@ class _Structs:
 
     def save_data(self, page, data, summary='', minor=False):
         """Saves data for a given page (creates a new revision)."""
+        self._dokuwiki._cached_send.cache_clear()
         return self._dokuwiki.send('plugin.struct.saveData', page, data, summary, minor)
 
-    def get_schema(self, name=''):
-        """Get info about existing schemas columns."""
-        return self._dokuwiki.send('plugin.struct.getSchema', name)
+    def get_schema(self, name='', cache=False):
+        """Get info about existing schemas columns. If *cache* is set, the
+        result is cached until data is modified with this object."""
+        send = self._dokuwiki._send_cached if cache else self._dokuwiki.send
+        return send('plugin.struct.getSchema', name)
 
     def get_aggregation_data(self, schemas, columns, data_filter=[], sort=''):
         """Get the data that would be shown in an aggregation."""
@@ -451,6 +1034,176 @@ class _Structs:
             'plugin.struct.getAggregationData', schemas, columns, data_filter, sort)
 
 
+class ProxyPool:
+    """Pool of *size* threads executing calls to the wiki of *dokuwiki*
+    concurrently, each thread using its own copy of *dokuwiki* (and so its own
+    connection). It is returned by `DokuWiki.pool` and should be closed after
+    use, which is done when used as a context manager.
+
+    .. note::
+
+        A transport given with the ``transport`` parameter of `DokuWiki` is
+        shared by all threads so it must be thread-safe.
+    """
+    def __init__(self, dokuwiki, size=8):
+        self._dokuwiki = dokuwiki
+        self._executor = ThreadPoolExecutor(max_workers=size)
+        self._local = threading.local()
+        self._clones = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _clone(self):
+        """Returns the copy of the `DokuWiki` object of the current thread."""
+        try:
+            return self._local.dokuwiki
+        except AttributeError:
+            dokuwiki = self._dokuwiki._clone()
+            self._local.dokuwiki = dokuwiki
+            self._clones.append(dokuwiki)
+            return dokuwiki
+
+    def _submit(self, func):
+        """Schedule the execution of *func* with the copy of the `DokuWiki`
+        object of a worker thread."""
+        return self._executor.submit(lambda: func(self._clone()))
+
+    def submit(self, command, *args, **kwargs):
+        """Schedule the execution of *command* like `DokuWiki.send` and returns
+        a `concurrent.futures.Future` of its result."""
+        return self._submit(lambda dokuwiki: dokuwiki.send(command, *args, **kwargs))
+
+    def map(self, command, args_list):
+        """Execute *command* concurrently for each element of *args_list* (a
+        tuple of arguments or a single argument) and returns the list of the
+        results (in the same order)::
+
+            pool.map('wiki.getPage', ['page1', 'page2'])
+            pool.map('wiki.getPageVersion', [('page1', 0), ('page2', 0)])
+        """
+        futures = [self.submit(command, *(args if isinstance(args, tuple) else (args,)))
+                   for args in args_list]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Wait for the running calls and close the connections of the pool."""
+        self._executor.shutdown()
+        for dokuwiki in self._clones:
+            dokuwiki.close()
+
+
+class AsyncDokuWiki:
+    """Asynchronous interface to a DokuWiki wiki, for running calls concurrently
+    with `asyncio` instead of paying one network round-trip after the other.
+    Parameters are the ones of `DokuWiki` plus *workers*, the maximum number
+    of concurrent calls.
+
+    The constructor does no I/O: the connection to the wiki is opened (and
+    checked, like for `DokuWiki`) by the `connect` coroutine, which is called
+    when entering the context manager or else by the first call. Calls are
+    then executed by a `ProxyPool` of *workers* threads.
+
+    ``pages``, ``medias`` and ``structs`` provide the same methods than for
+    `DokuWiki` objects but as coroutines:
+
+    .. code::
+
+        async with dokuwiki.AsyncDokuWiki('URL', 'USER', 'PASSWORD') as wiki:
+            contents = await wiki.pages.get_many(['page1', 'page2'])
+    """
+    def __init__(self, url, user, password, workers=8, **kwargs):
+        self._args = (url, user, password)
+        self._kwargs = kwargs
+        self._workers = workers
+        self._connecting = None
+        self._wiki = None
+        self._pool = None
+
+        self.pages = _AsyncPages(self, _Pages)
+        self.medias = _AsyncNamespace(self, _Medias)
+        self.structs = _AsyncNamespace(self, _Structs)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # Waiting for the running calls would block the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def connect(self):
+        """Connect to the wiki if not already done. The `DokuWiki` object is
+        created in a thread for not blocking the event loop."""
+        if self._pool is not None:
+            return
+        if self._connecting is None:
+            self._connecting = asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(DokuWiki, *self._args, **self._kwargs))
+        try:
+            wiki = await self._connecting
+        except BaseException:
+            self._connecting = None
+            raise
+        if self._pool is None:
+            self._wiki = wiki
+            self._pool = wiki.pool(self._workers)
+
+    async def _run(self, func):
+        """Execute *func* with the `DokuWiki` object of a worker thread."""
+        await self.connect()
+        return await asyncio.wrap_future(self._pool._submit(func))
+
+    async def send(self, command, *args, **kwargs):
+        """Coroutine version of `DokuWiki.send`."""
+        return await self._run(lambda dokuwiki: dokuwiki.send(command, *args, **kwargs))
+
+    def close(self):
+        """Wait for the running calls and close the connections to the wiki."""
+        if self._pool is not None:
+            self._pool.close()
+            self._wiki.close()
+
+
+class _AsyncNamespace:
+    """Coroutine versions of the methods of a namespace (*cls*) of `DokuWiki`."""
+    def __init__(self, dokuwiki, cls):
+        self._dokuwiki = dokuwiki
+        self._name = cls.__name__.lstrip('_').lower()
+        self._cls = cls
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or not hasattr(self._cls, attr):
+            raise AttributeError(attr)
+
+        async def method(*args, **kwargs):
+            return await self._dokuwiki._run(lambda dokuwiki: getattr(
+                getattr(dokuwiki, self._name), attr)(*args, **kwargs))
+        method.__name__ = attr
+        method.__doc__ = getattr(self._cls, attr).__doc__
+        return method
+
+
+class _AsyncPages(_AsyncNamespace):
+    async def get_many(self, pages):
+        """Returns the content of the last version of each page of *pages*,
+        pages being retrieved concurrently."""
+        return await asyncio.gather(*(self.get(page) for page in pages))
+
+
+def _search_dataentry(content):
+    """Returns the match of the first dataentry of *content* (or None)."""
+    # Skip to the line of the first 'dataentry' word with str.find, which
+    # is much faster than the regex for scanning the preceding content.
+    idx = content.find('dataentry')
+    if idx == -1:
+        return None
+    return _DATAENTRY_RE.search(content, content.rfind('\n', 0, idx) + 1)
+
+
 class Dataentry:
     """Object that manage `data entries <https://www.dokuwiki.org/plugin:data>`_."""
 
@@ -459,45 +1212,30 @@ class Dataentry:
         """Get dataentry from *content*. *keep_order* indicates whether to
         return an ordered dictionary."""
         if keep_order:
-            from collections import OrderedDict
             dataentry = OrderedDict()
         else:
             dataentry = {}
 
-        found = False
-        for line in content.split('\n'):
-            if line.strip().startswith('---- dataentry'):
-                found = True
-                continue
-            elif line == '----':
-                break
-            elif not found:
-                continue
-
-            line_split = line.split(':')
-            key = line_split[0].strip()
-            value = re.sub('#.*$', '', ':'.join(line_split[1:])).strip()
-            dataentry.setdefault(key, value)
-
-        if not found:
+        match = _search_dataentry(content)
+        if match is None:
             raise DokuWikiError('no dataentry found')
+        for key, value in _DATAENTRY_LINE_RE.findall(match.group(1)):
+            dataentry.setdefault(key, value)
         return dataentry
 
     @staticmethod
     def gen(name, data):
         """Generate dataentry *name* from *data*."""
-        return '---- dataentry %s ----\n%s\n----' % (name, '\n'.join(
-            '%s:%s' % (attr, value) for attr, value in data.items()))
+        lines = [f'{attr}:{value}' for attr, value in data.items()]
+        return f'---- dataentry {name} ----\n' + '\n'.join(lines) + '\n----'
 
     @staticmethod
     def ignore(content):
         """Remove dataentry from *content*."""
-        page_content = []
-        start = False
-        for line in content.split('\n'):
-            if line == '----' and not start:
-                start = True
-                continue
-            if start:
-                page_content.append(line)
-        return '\n'.join(page_content) if page_content else content
+        match = _search_dataentry(content)
+        # Nothing is removed if the dataentry is not closed.
+        if match is None or match.group('end') is None:
+            return content
+        # The match ends before the line feed of the closing line.
+        end = match.end()
+        return content[end + 1 if content.startswith('\n', end) else end:]